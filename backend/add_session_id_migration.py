@@ -7,64 +7,121 @@ but the actual MySQL table is missing this column.
 import asyncio
 import sys
 from sqlalchemy import text
-from app.core.database import get_db_context
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from app.core.database import DATABASE_URL
 
+# Rows updated per backfill transaction
+BACKFILL_BATCH_SIZE = 5000
 
-async def add_session_id_column():
-    """Add session_id column to chat_history table if it doesn't exist."""
+# Dedicated single-connection engine so the migration cannot starve the app's pool
+migration_engine = create_async_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+migration_session_maker = async_sessionmaker(migration_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def add_session_id_column(use_generated_column: bool = False):
+    """
+    Add session_id column to chat_history table if it doesn't exist.
+
+    With use_generated_column, legacy values are materialized by MySQL's own
+    table rebuild (a STORED generated column) instead of batched UPDATEs.
+    Both ALTERs rebuild the table with ALGORITHM=COPY, so writes are blocked
+    while they run - only use it in a maintenance window.
+    """
+    try:
+        await _migrate(use_generated_column)
+    finally:
+        await migration_engine.dispose()
+
+
+async def _migrate(use_generated_column: bool):
+    """Run the session_id migration steps on the dedicated migration engine."""
 
     print("🔧 Starting migration: Adding session_id column to chat_history table...")
 
-    async with get_db_context() as db:
+    async with migration_session_maker() as db:
         try:
-            # Check if column exists
-            check_query = text("""
-                SELECT COUNT(*) as count
+            # Fetch the table's columns and indexes in one catalog round-trip
+            schema_query = text("""
+                SELECT 'column' AS kind, COLUMN_NAME AS name, IS_NULLABLE AS nullable
                 FROM INFORMATION_SCHEMA.COLUMNS
-                WHERE TABLE_SCHEMA = :database_name
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'chat_history'
+                UNION ALL
+                SELECT DISTINCT 'index' AS kind, INDEX_NAME AS name, NULL AS nullable
+                FROM INFORMATION_SCHEMA.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE()
                 AND TABLE_NAME = 'chat_history'
-                AND COLUMN_NAME = 'session_id'
             """)
 
-            result = await db.execute(
-                check_query,
-                {"database_name": settings.mysql_database}
-            )
-            row = result.fetchone()
+            result = await db.execute(schema_query)
+            rows = result.fetchall()
+            columns = {name: nullable for kind, name, nullable in rows if kind == "column"}
+            indexes = {name for kind, name, _ in rows if kind == "index"}
 
-            if row and row[0] > 0:
+            if columns.get("session_id") == "NO" and "idx_user_session" in indexes:
                 print("✅ Column 'session_id' already exists in chat_history table. No migration needed.")
                 return
 
-            print("📋 Column 'session_id' not found. Adding it now...")
-
-            # Add the column
-            alter_query = text("""
-                ALTER TABLE chat_history
-                ADD COLUMN session_id VARCHAR(255) NOT NULL DEFAULT 'legacy-session',
-                ADD INDEX idx_user_session (user_id, session_id)
-            """)
-
-            await db.execute(alter_query)
-            await db.commit()
-
-            print("✅ Successfully added session_id column to chat_history table!")
-            print("✅ Added composite index on (user_id, session_id)")
+            if use_generated_column and "session_id" not in columns:
+                print("📋 Column 'session_id' not found. Adding it as a stored generated column...")
+                await db.execute(text("""
+                    ALTER TABLE chat_history
+                    ADD COLUMN session_id VARCHAR(255)
+                    AS (CONCAT('legacy-', user_id, '-', datasource)) STORED NOT NULL
+                """))
+                # Drop the expression, keeping the materialized values, so the
+                # application can write session_id directly from now on
+                await db.execute(text("ALTER TABLE chat_history MODIFY session_id VARCHAR(255) NOT NULL"))
+                await db.commit()
+                columns["session_id"] = "NO"
+                print("✅ Added session_id column with legacy values filled in by the rebuild")
+
+            # Step 1: add the column as nullable - a metadata-only change,
+            # no table rewrite (INSTANT on MySQL 8.0.12+)
+            if "session_id" not in columns:
+                print("📋 Column 'session_id' not found. Adding it now...")
+                await db.execute(text("ALTER TABLE chat_history ADD COLUMN session_id VARCHAR(255) NULL"))
+                await db.commit()
+                print("✅ Successfully added session_id column to chat_history table!")
+
+            # Step 2: give legacy rows unique session IDs per user+datasource.
+            # Run in bounded batches so each transaction holds few row locks.
+            await db.execute(text("SET SESSION lock_wait_timeout = 10"))
 
-            # Update legacy rows to have unique session IDs per user+datasource
             update_query = text("""
                 UPDATE chat_history
                 SET session_id = CONCAT('legacy-', user_id, '-', datasource)
-                WHERE session_id = 'legacy-session'
+                WHERE session_id IS NULL
+                LIMIT :batch_size
             """)
 
-            result = await db.execute(update_query)
-            await db.commit()
+            rows_updated = 0
+            while True:
+                result = await db.execute(update_query, {"batch_size": BACKFILL_BATCH_SIZE})
+                await db.commit()
+
+                rows_updated += result.rowcount
+                print(f"   ...updated {result.rowcount} rows (total {rows_updated})")
+
+                if result.rowcount < BACKFILL_BATCH_SIZE:
+                    break
 
-            rows_updated = result.rowcount
             print(f"✅ Updated {rows_updated} existing rows with unique session IDs")
 
+            # Step 3: enforce NOT NULL and build the index online so writers are not blocked
+            add_index = "" if "idx_user_session" in indexes else "ADD INDEX idx_user_session (user_id, session_id),"
+            await db.execute(text(f"""
+                ALTER TABLE chat_history
+                MODIFY session_id VARCHAR(255) NOT NULL,
+                {add_index}
+                ALGORITHM=INPLACE, LOCK=NONE
+            """))
+            await db.commit()
+
+            print("✅ Made session_id NOT NULL")
+            if add_index:
+                print("✅ Added composite index on (user_id, session_id)")
+
         except Exception as e:
             print(f"❌ Migration failed: {e}")
             await db.rollback()
@@ -76,7 +133,7 @@ async def add_session_id_column():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(add_session_id_column())
+        asyncio.run(add_session_id_column(use_generated_column="--generated" in sys.argv[1:]))
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Migration failed with error: {e}")
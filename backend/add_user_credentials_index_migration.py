@@ -0,0 +1,97 @@
+"""
+Migration script to replace the user_credentials single-column indexes with a
+composite (user_id, datasource) index.
+
+The UserCredential model declares idx_user_datasource, but create_all only
+applies it to newly created tables. Existing databases still carry the old
+per-column indexes and need this one-off migration.
+"""
+import asyncio
+import sys
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from app.core.database import DATABASE_URL
+
+# Dedicated single-connection engine so the migration cannot starve the app's pool
+migration_engine = create_async_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+migration_session_maker = async_sessionmaker(migration_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Single-column indexes made redundant by the composite index
+REDUNDANT_INDEX_COLUMNS = {"user_id", "datasource"}
+
+
+async def add_user_credentials_index():
+    """Add idx_user_datasource to user_credentials and drop the old single-column indexes."""
+    try:
+        await _migrate()
+    finally:
+        await migration_engine.dispose()
+
+
+async def _migrate():
+    """Run the index migration steps on the dedicated migration engine."""
+
+    print("🔧 Starting migration: Adding composite index to user_credentials table...")
+
+    async with migration_session_maker() as db:
+        try:
+            # Fetch every index on the table with its columns in order
+            result = await db.execute(text("""
+                SELECT INDEX_NAME AS name,
+                       GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS columns
+                FROM INFORMATION_SCHEMA.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'user_credentials'
+                GROUP BY INDEX_NAME
+            """))
+            indexes = {name: columns.split(",") for name, columns in result.fetchall()}
+
+            if not indexes:
+                print("❌ Table 'user_credentials' not found. Run create_tables.py first.")
+                return
+
+            await db.execute(text("SET SESSION lock_wait_timeout = 10"))
+
+            # Step 1: build the composite index online. It must exist before the
+            # old user_id index is dropped, because the users.id foreign key needs
+            # an index led by user_id at all times.
+            if "idx_user_datasource" in indexes:
+                print("✅ Index 'idx_user_datasource' already exists.")
+            else:
+                print("📋 Adding index 'idx_user_datasource' (user_id, datasource)...")
+                await db.execute(text("""
+                    ALTER TABLE user_credentials
+                    ADD INDEX idx_user_datasource (user_id, datasource),
+                    ALGORITHM=INPLACE, LOCK=NONE
+                """))
+                await db.commit()
+                print("✅ Added composite index on (user_id, datasource)")
+
+            # Step 2: drop the single-column indexes the composite one covers
+            redundant = [
+                name for name, columns in indexes.items()
+                if name != "PRIMARY" and len(columns) == 1 and columns[0] in REDUNDANT_INDEX_COLUMNS
+            ]
+            for name in redundant:
+                await db.execute(text(f"ALTER TABLE user_credentials DROP INDEX `{name}`, ALGORITHM=INPLACE, LOCK=NONE"))
+                await db.commit()
+                print(f"✅ Dropped redundant index '{name}'")
+
+            if not redundant:
+                print("✅ No redundant single-column indexes left to drop.")
+
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            await db.rollback()
+            raise
+
+    print("\n🎉 Migration completed successfully!")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(add_user_credentials_index())
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n❌ Migration failed with error: {e}")
+        sys.exit(1)
@@ -11,14 +11,17 @@ Endpoints:
 - POST /api/agent/detect - Check if query needs multiple sources
 """
 
+import asyncio
 import logging
-import json
+import time
+import orjson
 from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.responses import StreamingResponse
-from typing import Optional, List
+from sse_starlette.sse import EventSourceResponse
+from typing import Dict, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.agent_service import agent_orchestrator
+from app.services.mcp_service import mcp_service
 from app.middleware.auth import get_current_user_optional as get_current_user
 from app.core.database import get_db
 from app.models.database import User
@@ -35,6 +38,34 @@ logger = logging.getLogger(__name__)
 # Create router with prefix and tags
 router = APIRouter(prefix="/api/agent", tags=["agent"])
 
+# Keepalive comment interval and per-frame send deadline for SSE streams (seconds)
+SSE_PING_INTERVAL = 15
+SSE_SEND_TIMEOUT = 30
+
+# SSE frame delimiters, joined with the orjson payload by a single bytes concat
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_ORJSON_SSE_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+# Synthesis chunks dominate the stream, so only their data payload is encoded per token
+_SYNTHESIS_CHUNK_PREFIX = _SSE_PREFIX + b'{"event_type":"synthesis_chunk","data":'
+_SYNTHESIS_CHUNK_SUFFIX = b"}" + _SSE_SUFFIX
+
+# Tracebacks for unexpected errors are logged at most once per exception type per interval
+_TRACEBACK_LOG_INTERVAL = 60  # seconds
+_traceback_logged_at: Dict[str, float] = {}
+
+
+def _log_unexpected_error(message: str, exc: Exception) -> None:
+    """Log an unexpected endpoint error, formatting its traceback only when not seen recently."""
+    now = time.monotonic()
+    key = type(exc).__name__
+    if now - _traceback_logged_at.get(key, float("-inf")) >= _TRACEBACK_LOG_INTERVAL:
+        _traceback_logged_at[key] = now
+        logger.error(message, exc_info=exc)
+    else:
+        logger.error(message)
+
 
 @router.post("/query", response_model=MultiSourceResponse)
 async def execute_multi_source_query(
@@ -80,12 +111,11 @@ async def execute_multi_source_query(
         ```
     """
     try:
-        # Get credential session ID from cookies (for anonymous users)
-        credential_session_id = req.cookies.get("session_id")
-        
-        # Use user_id for credentials if authenticated
+        # Use user_id for credentials if authenticated, else the session cookie (anonymous users)
         if user:
             credential_session_id = user.id
+        else:
+            credential_session_id = req.cookies.get("session_id")
         
         logger.info(f"Multi-source query request: {request.query[:100]}...")
         
@@ -100,7 +130,7 @@ async def execute_multi_source_query(
         return response
         
     except Exception as e:
-        logger.error(f"Multi-source query failed: {e}", exc_info=True)
+        _log_unexpected_error(f"Multi-source query failed: {e}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -131,7 +161,7 @@ async def execute_multi_source_query_stream(
         - error: An error occurred
     
     Returns:
-        StreamingResponse with SSE events
+        EventSourceResponse with SSE events
     
     Example SSE stream:
         ```
@@ -144,11 +174,11 @@ async def execute_multi_source_query_stream(
         ```
     """
     try:
-        # Get credential session ID from cookies
-        credential_session_id = req.cookies.get("session_id")
-        
+        # Use user_id for credentials if authenticated, else the session cookie (anonymous users)
         if user:
             credential_session_id = user.id
+        else:
+            credential_session_id = req.cookies.get("session_id")
         
         async def event_generator():
             """Generate Server-Sent Events for query progress."""
@@ -160,15 +190,23 @@ async def execute_multi_source_query_stream(
                     credential_session_id=credential_session_id,
                     db=db if user else None,
                 ):
-                    # Format as SSE
+                    if event.event_type == "synthesis_chunk":
+                        yield _SYNTHESIS_CHUNK_PREFIX + orjson.dumps(event.data) + _SYNTHESIS_CHUNK_SUFFIX
+                        continue
+
+                    # Format as SSE; orjson serializes the datetime natively
                     event_data = {
                         "event_type": event.event_type,
                         "data": event.data,
                         "message": event.message,
-                        "timestamp": event.timestamp.isoformat(),
+                        "timestamp": event.timestamp,
                     }
-                    yield f"data: {json.dumps(event_data)}\n\n"
-                    
+                    yield _SSE_PREFIX + orjson.dumps(event_data, option=_ORJSON_SSE_OPTIONS) + _SSE_SUFFIX
+
+            except asyncio.CancelledError:
+                # Client went away; let cancellation reach the orchestrator
+                logger.info("Client disconnected from multi-source stream")
+                raise
             except Exception as e:
                 logger.error(f"Stream error: {e}")
                 error_event = {
@@ -176,20 +214,18 @@ async def execute_multi_source_query_stream(
                     "data": {"error": str(e)},
                     "message": f"Error: {str(e)}",
                 }
-                yield f"data: {json.dumps(error_event)}\n\n"
+                yield _SSE_PREFIX + orjson.dumps(error_event) + _SSE_SUFFIX
         
-        return StreamingResponse(
+        # Frames are pre-encoded bytes, which EventSourceResponse sends as-is;
+        # it adds keepalive pings, disconnect cancellation and the no-buffering headers
+        return EventSourceResponse(
             event_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Disable nginx buffering
-            },
+            ping=SSE_PING_INTERVAL,
+            send_timeout=SSE_SEND_TIMEOUT,
         )
         
     except Exception as e:
-        logger.error(f"Stream setup failed: {e}", exc_info=True)
+        _log_unexpected_error(f"Stream setup failed: {e}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -278,12 +314,16 @@ async def detect_multi_source(query: str):
         ```
     """
     try:
-        # Check if multi-source processing is appropriate
-        is_multi_source = await agent_orchestrator.detect_if_multi_source(query)
-        
-        # Get source suggestions
-        suggestions = await agent_orchestrator.suggest_sources(query, max_suggestions=3)
-        
+        # Run the multi-source check and source suggestion concurrently
+        is_multi_source, suggestions = await asyncio.gather(
+            agent_orchestrator.detect_if_multi_source(query),
+            agent_orchestrator.suggest_sources(query, max_suggestions=3),
+            return_exceptions=True,
+        )
+        for result in (is_multi_source, suggestions):
+            if isinstance(result, Exception):
+                raise result
+
         return {
             "is_multi_source": is_multi_source,
             "suggested_sources": [s.datasource for s in suggestions],
@@ -333,7 +373,6 @@ async def get_available_sources():
         ]
         ```
     """
-    from app.services.mcp_service import mcp_service
     return mcp_service.get_available_datasources()
 
 
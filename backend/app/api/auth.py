@@ -1,14 +1,16 @@
 """Authentication endpoints for Google OAuth and JWT."""
 
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import RedirectResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.middleware.auth import get_current_user, get_current_user_optional
+from app.middleware.auth import get_current_user, get_current_user_claims_optional
+from app.models.auth import AuthStatus, UserInfo
 from app.models.database import User
 from app.services.auth_service import auth_service, oauth
 
@@ -16,6 +18,21 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
+# Auth cookie attributes are fixed for the life of the process, so build them once
+_AUTH_COOKIE_NAME = "access_token"
+_AUTH_COOKIE_KWARGS = {
+    "path": "/",
+    "httponly": True,
+    "secure": False,  # Set to True in production (HTTPS)
+    "samesite": "lax",
+}
+_AUTH_COOKIE_MAX_AGE = settings.jwt_access_token_expire_minutes * 60
+
+
+def _set_auth_cookie(response: Response, token: str) -> None:
+    """Attach the JWT access token cookie to a response."""
+    response.set_cookie(_AUTH_COOKIE_NAME, token, max_age=_AUTH_COOKIE_MAX_AGE, **_AUTH_COOKIE_KWARGS)
+
 
 @router.get("/google")
 async def google_login(request: Request):
@@ -36,7 +53,6 @@ async def google_login(request: Request):
 @router.get("/callback")
 async def google_callback(
     request: Request,
-    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -84,7 +100,12 @@ async def google_callback(
 
         # Create JWT access token
         access_token = auth_service.create_access_token(
-            data={"user_id": user.id, "email": user.email}
+            data={
+                "user_id": user.id,
+                "email": user.email,
+                "name": user.name,
+                "picture": user.profile_picture,
+            }
         )
 
         # For development, redirect to frontend with token in query param
@@ -93,14 +114,7 @@ async def google_callback(
 
         # Set token in HTTPOnly cookie
         response = RedirectResponse(url=f"{frontend_url}/auth/callback?success=true")
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            httponly=True,
-            secure=False,  # Set to True in production (HTTPS)
-            samesite="lax",
-            max_age=86400,  # 24 hours
-        )
+        _set_auth_cookie(response, access_token)
 
         logger.info(f"User authenticated successfully: {email}")
         return response
@@ -112,7 +126,7 @@ async def google_callback(
         return RedirectResponse(url=f"{frontend_url}/auth/callback?error=auth_failed")
 
 
-@router.get("/me")
+@router.get("/me", response_model=UserInfo)
 async def get_current_user_info(
     current_user: User = Depends(get_current_user),
 ):
@@ -121,44 +135,38 @@ async def get_current_user_info(
 
     Protected endpoint that requires valid JWT token.
     """
-    return {
-        "id": current_user.id,
-        "email": current_user.email,
-        "name": current_user.name,
-        "profile_picture": current_user.profile_picture,
-        "created_at": current_user.created_at.isoformat() if current_user.created_at else None,
-    }
+    return UserInfo.model_validate(current_user)
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout():
     """
     Logout user by clearing authentication cookie.
     """
     response = JSONResponse(content={"message": "Logged out successfully"})
-    response.delete_cookie(key="access_token")
+    response.delete_cookie(_AUTH_COOKIE_NAME, **_AUTH_COOKIE_KWARGS)
     logger.info("User logged out")
     return response
 
 
-@router.get("/status")
+@router.get("/status", response_model=AuthStatus, response_model_exclude_unset=True)
 async def auth_status(
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    claims: Optional[Dict[str, Any]] = Depends(get_current_user_claims_optional),
 ):
     """
     Check authentication status.
 
+    Answered from the verified JWT claims alone, without a database lookup.
     Returns authenticated user info if logged in, otherwise returns not authenticated.
     """
-    if current_user:
-        return {
-            "authenticated": True,
-            "user": {
-                "id": current_user.id,
-                "email": current_user.email,
-                "name": current_user.name,
-                "profile_picture": current_user.profile_picture,
-            },
-        }
-    else:
-        return {"authenticated": False}
+    if claims:
+        return AuthStatus(
+            authenticated=True,
+            user=UserInfo(
+                id=claims["user_id"],
+                email=claims.get("email"),
+                name=claims.get("name"),
+                profile_picture=claims.get("picture"),
+            ),
+        )
+    return AuthStatus(authenticated=False)
@@ -1,20 +1,190 @@
 """Chat API routes."""
 
-from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.responses import StreamingResponse
-from typing import List, Optional
+import asyncio
+import hashlib
+import logging
+import time
+from fastapi import APIRouter, HTTPException, Request, Depends, Query
+from sse_starlette.sse import EventSourceResponse
+from typing import Any, Dict, List, Optional
+from types import MappingProxyType
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
+import orjson
 
 from app.models.chat import ChatRequest, ChatResponse, SessionCreate, Session
 from app.services.chat_service import chat_service
+from app.services.claude_client import claude_client
 from app.middleware.auth import get_current_user_optional as get_current_user
 from app.core.database import get_db
 from app.core.security import generate_session_id
 from app.models.database import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+# Keepalive comment interval and per-frame send deadline for SSE streams (seconds)
+SSE_PING_INTERVAL = 15
+SSE_SEND_TIMEOUT = 30
+
+# SSE frame delimiters, joined with the orjson payload by a single bytes concat
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+# Fast, cheap model used for follow-up question generation
+FOLLOW_UP_MODEL = "claude-3-5-haiku-20241022"
+# Three questions of under 10 words each need well under this many tokens
+FOLLOW_UP_MAX_TOKENS = 120
+
+# Static instructions for follow-up question generation. Sent as a system block
+# marked for prompt caching so only the per-request conversation varies.
+FOLLOW_UP_SYSTEM_PROMPT = [{
+    "type": "text",
+    "text": """You suggest 3 natural follow-up questions a user might ask next about a conversation with their data source.
+
+Rules:
+- Questions should be specific to what was discussed, not generic
+- Questions should help the user explore the data further
+- Keep questions concise (under 10 words each)
+- Return ONLY the 3 questions, one per line, no numbering or bullets""",
+    "cache_control": {"type": "ephemeral"},
+}]
+
+# Per-request part of the follow-up prompt; only these three fields vary
+FOLLOW_UP_USER_PROMPT = """Conversation about {datasource}.
+
+User asked: {query}
+
+Response summary: {context}..."""
+
+# The follow-up prompt only uses this much of the response, so generation can
+# start as soon as that much has streamed instead of after the last token
+FOLLOW_UP_CONTEXT_CHARS = 500
+
+# Streamed text is coalesced into one content frame per this many characters
+# or this many seconds, whichever comes first, instead of one frame per token
+CONTENT_BATCH_CHARS = 64
+CONTENT_BATCH_INTERVAL = 0.02
+
+
+class _ContentBatcher:
+    """Coalesces streamed text chunks into fewer SSE content frames."""
+
+    __slots__ = ("_parts", "_chars", "_last_flush")
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._chars = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, text: str) -> Optional[bytes]:
+        """Buffer text; return a frame once the size or age threshold is reached."""
+        self._parts.append(text)
+        self._chars += len(text)
+        if self._chars >= CONTENT_BATCH_CHARS or time.monotonic() - self._last_flush >= CONTENT_BATCH_INTERVAL:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[bytes]:
+        """Return a frame with all buffered text, or None if nothing is buffered."""
+        if not self._parts:
+            return None
+        frame = _SSE_PREFIX + orjson.dumps({"type": "content", "content": "".join(self._parts)}) + _SSE_SUFFIX
+        self._parts.clear()
+        self._chars = 0
+        self._last_flush = time.monotonic()
+        return frame
+
+
+# The session frame has a single variable field; session IDs can be client-supplied,
+# so the value is still JSON-escaped by orjson rather than spliced in raw
+_SESSION_FRAME_PREFIX = _SSE_PREFIX + b'{"type":"session","session_id":'
+_SESSION_FRAME_SUFFIX = b"}" + _SSE_SUFFIX
+
+# Every stream opens with the same "Analyzing query" step; only its timestamp varies
+_ANALYZING_STEP_FRAME = (
+    _SSE_PREFIX
+    + b'{"type":"agent_step","step":{"id":"step-1","type":"thinking","title":"Analyzing query",'
+    + b'"status":"active","timestamp":%d,"description":"Understanding your request..."}}'
+    + _SSE_SUFFIX
+)
+
+
+# Static follow-ups served when generation fails, keyed by datasource (read-only)
+FOLLOW_UP_FALLBACKS = MappingProxyType({
+    "mysql": ("Show related records", "What are the column types?", "Any null values?"),
+    "s3": ("List other objects", "Show file metadata", "Download this file"),
+    "jira": ("Show related issues", "Who else is involved?", "What's the history?"),
+    "google_workspace": ("Show recent changes", "Who has access?", "Search similar"),
+})
+DEFAULT_FOLLOW_UPS = ("Tell me more", "Show details", "What else?")
+
+# Generated follow-ups, keyed on everything the prompt is built from - an
+# identical prompt is answered from here without another Haiku round-trip
+FOLLOW_UP_CACHE: Dict[str, Dict[str, Any]] = {}  # {prompt_hash: {"questions": [...], "timestamp": float}}
+FOLLOW_UP_CACHE_TTL = 86400  # 24 hours
+FOLLOW_UP_CACHE_MAX_SIZE = 4096
+
+
+def make_sse(data: dict) -> bytes:
+    """Format a payload as an SSE data frame."""
+    return _SSE_PREFIX + orjson.dumps(data) + _SSE_SUFFIX
+
+
+def make_step(step_id: str, step_type: str, title: str, status: str, description: str = "", duration: int = None) -> dict:
+    """Create an agent step event."""
+    step = {
+        "id": step_id,
+        "type": step_type,
+        "title": title,
+        "status": status,
+        "timestamp": time.time_ns() // 1_000_000
+    }
+    if description:
+        step["description"] = description
+    if duration is not None:
+        step["duration"] = duration
+    return {"type": "agent_step", "step": step}
+
+
+async def generate_follow_up_questions(query: str, response: str, datasource: str) -> List[str]:
+    """Generate contextual follow-up questions using Claude Haiku."""
+    context = response[:FOLLOW_UP_CONTEXT_CHARS]
+    cache_key = hashlib.md5(f"{datasource}\0{query}\0{context}".encode()).hexdigest()
+    now = time.time()
+
+    cached = FOLLOW_UP_CACHE.get(cache_key)
+    if cached and now - cached["timestamp"] < FOLLOW_UP_CACHE_TTL:
+        return list(cached["questions"])
+
+    try:
+        result = await claude_client.async_client.messages.create(
+            model=FOLLOW_UP_MODEL,
+            max_tokens=FOLLOW_UP_MAX_TOKENS,
+            system=FOLLOW_UP_SYSTEM_PROMPT,
+            messages=[{
+                "role": "user",
+                "content": FOLLOW_UP_USER_PROMPT.format(datasource=datasource, query=query, context=context),
+            }]
+        )
+
+        # Parse the response into a list
+        questions = [q.strip() for q in result.content[0].text.strip().split('\n') if q.strip()][:3]
+
+    except Exception as e:
+        # Fallback to static questions if AI fails; not cached so the next request retries
+        logger.warning(f"Failed to generate follow-ups: {e}")
+        return list(FOLLOW_UP_FALLBACKS.get(datasource, DEFAULT_FOLLOW_UPS))
+
+    # Prune cache if too large
+    if len(FOLLOW_UP_CACHE) >= FOLLOW_UP_CACHE_MAX_SIZE:
+        sorted_keys = sorted(FOLLOW_UP_CACHE, key=lambda k: FOLLOW_UP_CACHE[k]["timestamp"])
+        for key in sorted_keys[:FOLLOW_UP_CACHE_MAX_SIZE // 10]:
+            del FOLLOW_UP_CACHE[key]
+
+    FOLLOW_UP_CACHE[cache_key] = {"questions": tuple(questions), "timestamp": now}
+    return questions
+
 
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
@@ -28,36 +198,31 @@ async def send_message(
 
     Supports both authenticated and anonymous users.
     """
-    try:
-        # Generate session ID if not provided
-        session_id = request.session_id or generate_session_id()
+    # Generate session ID if not provided
+    session_id = request.session_id or generate_session_id()
 
-        # Get credential session ID from cookies (for anonymous users)
+    # Use user_id for credentials if authenticated, else the session cookie (anonymous users)
+    if user:
+        credential_session_id = user.id
+    else:
         credential_session_id = req.cookies.get("session_id")
 
-        # Use user_id for credentials if authenticated
-        if user:
-            credential_session_id = user.id
+    # Process message
+    response_text, tool_calls = await chat_service.process_message(
+        message=request.message,
+        datasource=request.datasource,
+        session_id=session_id,
+        credential_session_id=credential_session_id,
+        user_id=user.id if user else None,
+        db=db if user else None,
+    )
 
-        # Process message
-        response_text, tool_calls = await chat_service.process_message(
-            message=request.message,
-            datasource=request.datasource,
-            session_id=session_id,
-            credential_session_id=credential_session_id,
-            user_id=user.id if user else None,
-            db=db if user else None,
-        )
-
-        return ChatResponse(
-            message=response_text,
-            session_id=session_id,
-            datasource=request.datasource,
-            tool_calls=tool_calls if tool_calls else None,
-        )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return ChatResponse(
+        message=response_text,
+        session_id=session_id,
+        datasource=request.datasource,
+        tool_calls=tool_calls if tool_calls else None,
+    )
 
 
 @router.post("/message/stream")
@@ -72,195 +237,176 @@ async def send_message_stream(
 
     Supports both authenticated and anonymous users.
     """
-    try:
-        # Generate session ID if not provided
-        session_id = request.session_id or generate_session_id()
+    # Generate session ID if not provided
+    session_id = request.session_id or generate_session_id()
 
-        # Get credential session ID from cookies (for anonymous users)
+    # Use user_id for credentials if authenticated, else the session cookie (anonymous users)
+    if user:
+        credential_session_id = user.id
+    else:
         credential_session_id = req.cookies.get("session_id")
 
-        # Use user_id for credentials if authenticated
-        if user:
-            credential_session_id = user.id
-
-        async def event_generator():
-            """Generate Server-Sent Events with structured agent steps."""
-            import time
-            step_counter = 0
-            start_time = time.time()
-            sources_used = []  # Track sources/tools used
-            accumulated_content = ""  # For generating follow-ups
-
-            def make_sse(data: dict) -> str:
-                """Helper to format SSE data."""
-                return f"data: {json.dumps(data)}\n\n"
-
-            def make_step(step_id: str, step_type: str, title: str, status: str, description: str = "", duration: int = None) -> dict:
-                """Helper to create agent step events."""
-                step = {
-                    "id": step_id,
-                    "type": step_type,
-                    "title": title,
-                    "status": status,
-                    "timestamp": int(time.time() * 1000)
-                }
-                if description:
-                    step["description"] = description
-                if duration is not None:
-                    step["duration"] = duration
-                return {"type": "agent_step", "step": step}
-
-            async def generate_follow_up_questions(query: str, response: str, datasource: str) -> List[str]:
-                """Generate contextual follow-up questions using Claude Haiku."""
-                from anthropic import Anthropic
-                from app.core.config import settings
-
-                try:
-                    client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-
-                    # Use Haiku for fast, cheap follow-up generation
-                    result = client.messages.create(
-                        model="claude-3-5-haiku-20241022",
-                        max_tokens=200,
-                        messages=[{
-                            "role": "user",
-                            "content": f"""Based on this conversation about {datasource}, suggest 3 natural follow-up questions the user might ask next.
-
-User asked: {query}
-
-Response summary: {response[:500]}...
-
-Rules:
-- Questions should be specific to what was discussed, not generic
-- Questions should help the user explore the data further
-- Keep questions concise (under 10 words each)
-- Return ONLY the 3 questions, one per line, no numbering or bullets"""
-                        }]
-                    )
-
-                    # Parse the response into a list
-                    questions = [q.strip() for q in result.content[0].text.strip().split('\n') if q.strip()]
-                    return questions[:3]
-
-                except Exception as e:
-                    # Fallback to static questions if AI fails
-                    logger.warning(f"Failed to generate follow-ups: {e}")
-                    fallback = {
-                        "mysql": ["Show related records", "What are the column types?", "Any null values?"],
-                        "s3": ["List other objects", "Show file metadata", "Download this file"],
-                        "jira": ["Show related issues", "Who else is involved?", "What's the history?"],
-                        "google_workspace": ["Show recent changes", "Who has access?", "Search similar"],
-                    }
-                    return fallback.get(datasource, ["Tell me more", "Show details", "What else?"])
-
+    async def event_generator():
+        """Generate Server-Sent Events with structured agent steps."""
+        step_counter = 0
+        start_time = time.monotonic()
+        sources_used = []  # Track sources/tools used
+        # Head of the response, kept only until follow-up generation starts
+        response_head: List[str] = []
+        response_head_chars = 0
+        followup_task = None  # Started mid-stream once enough context exists
+        content_batch = _ContentBatcher()
+
+        try:
+            # Send session ID first
+            yield _SESSION_FRAME_PREFIX + orjson.dumps(session_id) + _SESSION_FRAME_SUFFIX
+
+            # Send initial thinking step
+            step_counter += 1
+            yield _ANALYZING_STEP_FRAME % (time.time_ns() // 1_000_000)
+
+            # Stream the response
+            stream = chat_service.process_message_stream(
+                message=request.message,
+                datasource=request.datasource,
+                session_id=session_id,
+                credential_session_id=credential_session_id,
+                user_id=user.id if user else None,
+                db=db if user else None,
+            )
+            # EventSourceResponse cancels this generator when the client disconnects;
+            # the finally blocks then close the upstream stream and any follow-up task
             try:
-                # Send session ID first
-                yield make_sse({"type": "session", "session_id": session_id})
-
-                # Send initial thinking step
-                step_counter += 1
-                yield make_sse(make_step(
-                    f"step-{step_counter}", "thinking", "Analyzing query", "active",
-                    "Understanding your request..."
-                ))
-
-                # Stream the response
-                async for chunk in chat_service.process_message_stream(
-                    message=request.message,
-                    datasource=request.datasource,
-                    session_id=session_id,
-                    credential_session_id=credential_session_id,
-                    user_id=user.id if user else None,
-                    db=db if user else None,
-                ):
-                    # Check if this is a structured event (dict) or plain text
-                    if isinstance(chunk, dict):
-                        # Structured event from backend
+                async for chunk in stream:
+                    # Text - plain or as a structured "text" event - is nearly every
+                    # chunk, so it is resolved first and takes the straight-line path
+                    if type(chunk) is str:
+                        text = chunk
+                    else:
                         event_type = chunk.get("type")
-                        if event_type == "thinking":
-                            step_counter += 1
-                            yield make_sse(make_step(
-                                f"step-{step_counter}", "thinking", "Thinking", "active",
-                                chunk.get("content", "")
-                            ))
-                        elif event_type == "tool_start":
-                            step_counter += 1
-                            tool_name = chunk.get("tool", "tool")
-                            # Track source used
-                            sources_used.append({
-                                "type": "tool",
-                                "name": tool_name,
-                                "description": chunk.get("description", "")
-                            })
-                            yield make_sse(make_step(
-                                f"step-{step_counter}", "tool_call", f"Using {tool_name}", "active",
-                                chunk.get("description", "Executing tool...")
-                            ))
-                        elif event_type == "tool_end":
-                            tool_name = chunk.get("tool", "tool")
-                            yield make_sse(make_step(
-                                f"step-{step_counter}", "tool_call", f"Completed {tool_name}", "complete"
+                        if event_type == "text":
+                            text = chunk.get("content", "")
+                        else:
+                            # Emit buffered text first so frames keep their order
+                            frame = content_batch.flush()
+                            if frame:
+                                yield frame
+                            if event_type == "thinking":
+                                step_counter += 1
+                                yield make_sse(make_step(
+                                    f"step-{step_counter}", "thinking", "Thinking", "active",
+                                    chunk.get("content", "")
+                                ))
+                            elif event_type == "tool_start":
+                                step_counter += 1
+                                tool_name = chunk.get("tool", "tool")
+                                # Track source used
+                                sources_used.append({
+                                    "type": "tool",
+                                    "name": tool_name,
+                                    "description": chunk.get("description", "")
+                                })
+                                yield make_sse(make_step(
+                                    f"step-{step_counter}", "tool_call", f"Using {tool_name}", "active",
+                                    chunk.get("description", "Executing tool...")
+                                ))
+                            elif event_type == "tool_end":
+                                tool_name = chunk.get("tool", "tool")
+                                yield make_sse(make_step(
+                                    f"step-{step_counter}", "tool_call", f"Completed {tool_name}", "complete"
+                                ))
+                            continue
+
+                    frame = content_batch.add(text)
+                    if frame:
+                        yield frame
+
+                    if followup_task is None:
+                        response_head.append(text)
+                        response_head_chars += len(text)
+                        if response_head_chars >= FOLLOW_UP_CONTEXT_CHARS:
+                            followup_task = asyncio.create_task(generate_follow_up_questions(
+                                request.message,
+                                "".join(response_head),
+                                request.datasource
                             ))
-                        elif event_type == "text":
-                            content = chunk.get("content", "")
-                            accumulated_content += content
-                            yield make_sse({"type": "content", "content": content})
-                    else:
-                        # Plain text chunk
-                        accumulated_content += chunk
-                        yield make_sse({"type": "content", "content": chunk})
-
-                # Send completion step
-                elapsed = time.time() - start_time
-                step_counter += 1
-                yield make_sse(make_step(
-                    f"step-{step_counter}", "complete", "Response ready", "complete",
-                    f"Completed in {elapsed:.1f}s", int(elapsed * 1000)
-                ))
+            finally:
+                await stream.aclose()
+
+            frame = content_batch.flush()
+            if frame:
+                yield frame
+
+            # Send completion step
+            elapsed = time.monotonic() - start_time
+            step_counter += 1
+            yield make_sse(make_step(
+                f"step-{step_counter}", "complete", "Response ready", "complete",
+                f"Completed in {elapsed:.1f}s", int(elapsed * 1000)
+            ))
+
+            # Add datasource as a source if no tools were called
+            if not sources_used:
+                sources_used.append({
+                    "type": "datasource",
+                    "name": request.datasource,
+                    "description": f"Connected to {request.datasource}"
+                })
 
-                # Generate contextual follow-up questions based on the actual conversation
-                follow_ups = await generate_follow_up_questions(
+            # Send done signal with metadata (Perplexity-style) right away;
+            # follow-ups get their own frame so the answer isn't held back for them
+            yield make_sse({
+                "type": "done",
+                "sources": sources_used,
+                "response_time_ms": int(elapsed * 1000)
+            })
+
+            # Generate contextual follow-up questions based on the actual conversation;
+            # short responses never reached the threshold, so start them now
+            if followup_task is None:
+                followup_task = asyncio.create_task(generate_follow_up_questions(
                     request.message,
-                    accumulated_content,
+                    "".join(response_head),
                     request.datasource
-                )
-
-                # Add datasource as a source if no tools were called
-                if not sources_used:
-                    sources_used.append({
-                        "type": "datasource",
-                        "name": request.datasource,
-                        "description": f"Connected to {request.datasource}"
-                    })
-
-                # Send done signal with metadata (Perplexity-style)
-                yield make_sse({
-                    "type": "done",
-                    "sources": sources_used,
-                    "follow_up_questions": follow_ups,
-                    "response_time_ms": int(elapsed * 1000)
-                })
+                ))
+            follow_ups = await followup_task
 
-            except Exception as e:
-                yield make_sse({"type": "error", "error": str(e)})
+            yield make_sse({"type": "follow_ups", "follow_up_questions": follow_ups})
 
-        return StreamingResponse(
-            event_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            },
-        )
+        except Exception as e:
+            # Deliver any text still buffered before reporting the failure
+            frame = content_batch.flush()
+            if frame:
+                yield frame
+            yield make_sse({"type": "error", "error": str(e)})
+        finally:
+            # Don't leave follow-up generation running for a client that has gone
+            if followup_task is not None and not followup_task.done():
+                followup_task.cancel()
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Keepalive pings stop proxies from dropping the connection while tools run
+    return EventSourceResponse(
+        event_generator(),
+        ping=SSE_PING_INTERVAL,
+        send_timeout=SSE_SEND_TIMEOUT,
+    )
 
 
 @router.get("/sessions", response_model=List[str])
-async def list_sessions():
-    """List all active chat sessions."""
-    return list(chat_service.sessions.keys())
+async def list_sessions(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """
+    List active chat sessions, one page at a time.
+
+    Sessions are listed in creation order. Pass the last session ID of a page
+    as `cursor` to get the next page; an unknown or expired cursor is a 400.
+    """
+    try:
+        return chat_service.sessions.page(cursor or None, limit)
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Unknown or expired cursor")
 
 
 @router.post("/sessions", response_model=dict)
@@ -298,40 +444,44 @@ async def get_session_info(
 
     Useful for debugging and verifying session persistence.
     """
-    try:
-        if user and db:
-            # Authenticated user - check database
-            messages = await chat_service.get_chat_history(
-                user_id=user.id,
-                datasource=datasource,
-                session_id=session_id,
-                db=db,
-            )
+    if user and db:
+        # Authenticated user - check database
+        # Count in SQL and fetch only the last 5 messages instead of the whole history
+        message_count = await chat_service.count_chat_history(
+            user_id=user.id,
+            datasource=datasource,
+            session_id=session_id,
+            db=db,
+        )
+        messages = await chat_service.get_chat_history(
+            user_id=user.id,
+            datasource=datasource,
+            session_id=session_id,
+            db=db,
+            limit=5,
+        )
+        return {
+            "session_id": session_id,
+            "datasource": datasource,
+            "user_id": user.id,
+            "message_count": message_count,
+            "storage": "database",
+            "messages": messages,  # Last 5 messages
+        }
+    else:
+        # Anonymous user - check in-memory
+        if session_id in chat_service.sessions:
+            messages = chat_service.sessions[session_id]
             return {
                 "session_id": session_id,
-                "datasource": datasource,
-                "user_id": user.id,
                 "message_count": len(messages),
-                "storage": "database",
-                "messages": messages if len(messages) <= 5 else messages[-5:],  # Last 5 messages
+                "storage": "in-memory",
+                "messages": messages if len(messages) <= 5 else messages[-5:],
             }
         else:
-            # Anonymous user - check in-memory
-            if session_id in chat_service.sessions:
-                messages = chat_service.sessions[session_id]
-                return {
-                    "session_id": session_id,
-                    "message_count": len(messages),
-                    "storage": "in-memory",
-                    "messages": messages if len(messages) <= 5 else messages[-5:],
-                }
-            else:
-                return {
-                    "session_id": session_id,
-                    "message_count": 0,
-                    "storage": "in-memory",
-                    "messages": [],
-                }
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            return {
+                "session_id": session_id,
+                "message_count": 0,
+                "storage": "in-memory",
+                "messages": [],
+            }
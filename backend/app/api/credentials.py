@@ -1,7 +1,9 @@
 """Credentials API endpoints."""
 
 import logging
-from typing import Dict, Optional
+import secrets
+import time
+from typing import Any, Dict, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Response, Request, Depends
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,6 +17,19 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/credentials", tags=["credentials"])
 
+# Anonymous credential session cookie attributes, fixed for the life of the process
+_SESSION_COOKIE_KWARGS = {
+    "httponly": True,
+    "samesite": "lax",
+    "max_age": 86400,  # 24 hours
+}
+
+# Signed-in users' credential status, so frontend status polling doesn't hit the
+# database every time; dropped whenever that user saves or deletes credentials
+STATUS_CACHE: Dict[Tuple[str, str], Dict[str, Any]] = {}  # {(user_id, datasource): {"configured": bool, "timestamp": float}}
+STATUS_CACHE_TTL = 5  # seconds
+STATUS_CACHE_MAX_SIZE = 50_000
+
 
 class CredentialsSaveRequest(BaseModel):
     """Request model for saving credentials."""
@@ -52,21 +67,15 @@ async def save_credentials(
                 db=db,
                 user_id=user.id,
             )
+            STATUS_CACHE.pop((user.id, request.datasource), None)
             logger.info(f"Credentials saved for user {user.id[:8]}... datasource: {request.datasource}")
         else:
             # Anonymous user - use session-based storage
             session_id = req.cookies.get("session_id")
             if not session_id:
                 # Generate new session ID
-                import secrets
                 session_id = secrets.token_urlsafe(32)
-                response.set_cookie(
-                    key="session_id",
-                    value=session_id,
-                    httponly=True,
-                    samesite="lax",
-                    max_age=86400,  # 24 hours
-                )
+                response.set_cookie("session_id", session_id, **_SESSION_COOKIE_KWARGS)
 
             await credential_service.save_credentials(
                 datasource=request.datasource,
@@ -100,11 +109,26 @@ async def get_credentials_status(
     try:
         if user:
             # Check for authenticated user
+            cache_key = (user.id, datasource)
+            now = time.time()
+
+            cached = STATUS_CACHE.get(cache_key)
+            if cached and now - cached["timestamp"] < STATUS_CACHE_TTL:
+                return {"configured": cached["configured"]}
+
             has_credentials = await credential_service.has_credentials(
                 datasource=datasource,
                 db=db,
                 user_id=user.id,
             )
+
+            # Prune cache if too large
+            if len(STATUS_CACHE) >= STATUS_CACHE_MAX_SIZE:
+                sorted_keys = sorted(STATUS_CACHE, key=lambda k: STATUS_CACHE[k]["timestamp"])
+                for key in sorted_keys[:STATUS_CACHE_MAX_SIZE // 10]:
+                    del STATUS_CACHE[key]
+
+            STATUS_CACHE[cache_key] = {"configured": has_credentials, "timestamp": now}
         else:
             # Check for anonymous user
             session_id = req.cookies.get("session_id")
@@ -142,6 +166,7 @@ async def delete_credentials(
                 db=db,
                 user_id=user.id,
             )
+            STATUS_CACHE.pop((user.id, datasource), None)
             logger.info(f"Credentials deleted for user {user.id[:8]}... datasource: {datasource}")
         else:
             # Delete for anonymous user
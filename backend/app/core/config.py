@@ -87,6 +87,11 @@ class Settings(BaseSettings):
     local_mysql_password: str = ""
     local_mysql_database: str = "connectorMCP"
 
+    # App database connection pool
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800  # Seconds; recycle before MySQL's wait_timeout drops idle connections
+
     # JIRA
     jira_url: str = ""
     jira_email: str = ""
@@ -21,8 +21,13 @@ engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,  # Enable connection health checks
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    # Applies to every session in the app, not just chat_history writes: the whole
+    # app runs at READ COMMITTED instead of MySQL's default REPEATABLE READ, which
+    # avoids InnoDB gap locks on inserts
+    isolation_level="READ COMMITTED",
 )
 
 # Create async session factory
@@ -42,10 +47,13 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         async def endpoint(db: AsyncSession = Depends(get_db)):
             # Use db session
     """
+    # Sessions connect lazily: a request that never queries (e.g. anonymous
+    # agent calls) never checks a connection out of the pool
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception as e:
             await session.rollback()
             logger.error(f"Database session error: {str(e)}")
@@ -0,0 +1,18 @@
+"""Response classes shared across API routers."""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson instead of the stdlib encoder.
+
+    orjson serializes dicts, lists and datetimes natively in Rust, so routers
+    returning plain payloads skip the Python-level json.dumps walk.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS)
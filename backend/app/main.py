@@ -1,16 +1,19 @@
 """FastAPI application entry point."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.responses import ORJSONResponse
 from app.api import chat, datasources, credentials, auth, agent
 from app.services.mcp_service import mcp_service
+from app.services.chat_service import chat_service
 
 # Configure logging
 logging.basicConfig(
@@ -50,8 +53,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Pre-warming failed (non-fatal): {e}")
 
+    # Clear idle anonymous chat sessions in the background
+    session_sweeper = asyncio.create_task(chat_service.sweep_idle_sessions())
+
     yield
 
+    session_sweeper.cancel()
+
     # Close persistent MCP connections on shutdown
     try:
         await mcp_service.close_all_persistent_sessions()
@@ -75,12 +83,35 @@ app = FastAPI(
     description="Backend API for ConnectorMCP - Multi-source data connector with MCP",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Add Session middleware (required for OAuth)
+# Origins allowed by the CORS middleware below, also needed by the 500 handler
+_CORS_ORIGINS = frozenset(settings.cors_origins_list)
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    """Turn any uncaught endpoint error into the API's standard 500 error body."""
+    response = ORJSONResponse(status_code=500, content={"detail": str(exc)})
+    # This handler runs outside CORSMiddleware, so the browser would otherwise
+    # hide the error from the frontend behind a CORS failure
+    origin = request.headers.get("origin")
+    if origin in _CORS_ORIGINS:
+        response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Vary"] = "Origin"
+    return response
+
+
+# Add Session middleware (required for OAuth).
+# The session only carries Authlib's OAuth state, signed into the cookie, so
+# state verification needs no server-side store and works across workers.
+# Expire it like a short-lived OAuth state rather than the 14-day default.
 app.add_middleware(
     SessionMiddleware,
     secret_key=settings.jwt_secret_key,  # Use the same secret as JWT
+    max_age=600,  # 10 minutes to complete the Google consent flow
 )
 
 # Add CORS middleware
@@ -1,7 +1,7 @@
 """Authentication middleware and dependencies."""
 
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from fastapi import Depends, HTTPException, status, Cookie, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -78,8 +78,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    user = await auth_service.get_user_by_id(db, user_id)
+    # Get user from the short-lived cache, falling back to the database
+    user = await auth_service.get_cached_user_by_id(db, user_id)
     if not user:
         logger.warning(f"User not found: {user_id}")
         raise HTTPException(
@@ -114,3 +114,32 @@ async def get_current_user_optional(
         return await get_current_user(db, credentials, access_token)
     except HTTPException:
         return None
+
+
+async def get_current_user_claims_optional(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    access_token: Optional[str] = Cookie(None),
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the verified JWT claims if authenticated, otherwise return None.
+
+    Only checks the token signature and expiry - no database lookup - so it
+    suits cheap, frequently polled endpoints. Use get_current_user when the
+    stored profile is needed.
+
+    Args:
+        credentials: HTTP Authorization credentials
+        access_token: JWT token from cookie
+
+    Returns:
+        Decoded token payload or None
+    """
+    token = access_token or (credentials.credentials if credentials else None)
+    if not token:
+        return None
+
+    payload = auth_service.decode_access_token(token)
+    if not payload or not payload.get("user_id"):
+        return None
+
+    return payload
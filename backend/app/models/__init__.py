@@ -9,6 +9,9 @@ from app.models.chat import (
     Session,
 )
 
+# Export auth models
+from app.models.auth import UserInfo, AuthStatus
+
 # Export agent orchestration models
 from app.models.agent import (
     AgentTaskStatus,
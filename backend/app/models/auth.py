@@ -0,0 +1,24 @@
+"""Authentication models."""
+
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional
+from datetime import datetime
+
+
+class UserInfo(BaseModel):
+    """Public profile of the authenticated user, read straight from the ORM row."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(..., description="User identifier")
+    email: str = Field(..., description="User email address")
+    name: Optional[str] = Field(None, description="Display name")
+    profile_picture: Optional[str] = Field(None, description="Profile picture URL")
+    created_at: Optional[datetime] = Field(None, description="Account creation time")
+
+
+class AuthStatus(BaseModel):
+    """Authentication status, with the user's profile when signed in."""
+
+    authenticated: bool = Field(..., description="Whether the request carries a valid session")
+    user: Optional[UserInfo] = Field(None, description="Signed-in user, if any")
@@ -71,12 +71,18 @@ class UserCredential(Base):
     __tablename__ = "user_credentials"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    datasource = Column(String(50), nullable=False, index=True)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    datasource = Column(String(50), nullable=False)
     encrypted_credentials = Column(Text, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Every credential lookup filters on both columns; user_id leads so the
+    # index also serves the users.id foreign key
+    __table_args__ = (
+        Index('idx_user_datasource', 'user_id', 'datasource'),
+    )
+
     def to_dict(self):
         """Convert user credential to dictionary."""
         return {
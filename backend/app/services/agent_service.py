@@ -16,6 +16,7 @@ The agent uses an intelligent planning approach with:
 
 import logging
 import asyncio
+import hashlib
 import time
 from typing import List, Dict, Any, Optional, AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -39,6 +40,11 @@ from app.models.agent import (
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Source suggestion cache - detection is a pure function of the query text
+SUGGESTION_CACHE: Dict[str, Dict[str, Any]] = {}  # {query_hash: {"suggestions": [...], "timestamp": float}}
+SUGGESTION_CACHE_TTL = 300  # 5 minutes
+SUGGESTION_CACHE_MAX_SIZE = 1024
+
 
 class AgentOrchestrator:
     """
@@ -183,7 +189,7 @@ class AgentOrchestrator:
             )
             
         except asyncio.TimeoutError:
-            logger.error("Multi-source query timed out", exc_info=True)
+            logger.error("Multi-source query timed out")
             return MultiSourceResponse(
                 response="The query took too long to complete. Please try a simpler query.",
                 session_id=session_id,
@@ -191,7 +197,7 @@ class AgentOrchestrator:
                 total_execution_time_ms=(time.time() - start_time) * 1000,
             )
         except (ConnectionError, OSError) as e:
-            logger.error(f"Multi-source query connection error: {e}", exc_info=True)
+            logger.error(f"Multi-source query connection error: {e}")
             return MultiSourceResponse(
                 response=f"Connection error while processing your query: {str(e)}",
                 session_id=session_id,
@@ -199,7 +205,7 @@ class AgentOrchestrator:
                 total_execution_time_ms=(time.time() - start_time) * 1000,
             )
         except ValueError as e:
-            logger.error(f"Multi-source query validation error: {e}", exc_info=True)
+            logger.error(f"Multi-source query validation error: {e}")
             return MultiSourceResponse(
                 response=f"Invalid query parameters: {str(e)}",
                 session_id=session_id,
@@ -301,52 +307,58 @@ class AgentOrchestrator:
                 tasks.append((source, task))
             
             # Wait for all tasks and emit events as they complete
-            for source, task in tasks:
-                yield AgentStreamEvent(
-                    event_type="source_start",
-                    data={"datasource": source},
-                    message=f"🔄 Querying {source.upper()}...",
-                )
-                
-                try:
-                    result = await asyncio.wait_for(
-                        task,
-                        timeout=self.query_timeout_seconds
+            try:
+                for source, task in tasks:
+                    yield AgentStreamEvent(
+                        event_type="source_start",
+                        data={"datasource": source},
+                        message=f"🔄 Querying {source.upper()}...",
                     )
-                    source_results.append(result)
-                    
-                    if result.success:
-                        yield AgentStreamEvent(
-                            event_type="source_complete",
-                            data={
-                                "datasource": source,
-                                "success": True,
-                                "tools_called": result.tools_called,
-                            },
-                            message=f"✅ {source.upper()} query complete",
+                
+                    try:
+                        result = await asyncio.wait_for(
+                            task,
+                            timeout=self.query_timeout_seconds
                         )
-                    else:
+                        source_results.append(result)
+                    
+                        if result.success:
+                            yield AgentStreamEvent(
+                                event_type="source_complete",
+                                data={
+                                    "datasource": source,
+                                    "success": True,
+                                    "tools_called": result.tools_called,
+                                },
+                                message=f"✅ {source.upper()} query complete",
+                            )
+                        else:
+                            yield AgentStreamEvent(
+                                event_type="source_complete",
+                                data={
+                                    "datasource": source,
+                                    "success": False,
+                                    "error": result.error,
+                                },
+                                message=f"⚠️ {source.upper()} query failed",
+                            )
+                        
+                    except asyncio.TimeoutError:
+                        source_results.append(SourceQueryResult(
+                            datasource=source,
+                            success=False,
+                            error="Query timed out",
+                        ))
                         yield AgentStreamEvent(
                             event_type="source_complete",
-                            data={
-                                "datasource": source,
-                                "success": False,
-                                "error": result.error,
-                            },
-                            message=f"⚠️ {source.upper()} query failed",
+                            data={"datasource": source, "success": False, "error": "Timeout"},
+                            message=f"⏱️ {source.upper()} query timed out",
                         )
-                        
-                except asyncio.TimeoutError:
-                    source_results.append(SourceQueryResult(
-                        datasource=source,
-                        success=False,
-                        error="Query timed out",
-                    ))
-                    yield AgentStreamEvent(
-                        event_type="source_complete",
-                        data={"datasource": source, "success": False, "error": "Timeout"},
-                        message=f"⏱️ {source.upper()} query timed out",
-                    )
+            finally:
+                # Don't leave source queries running if the client disconnects mid-stream
+                for _, task in tasks:
+                    if not task.done():
+                        task.cancel()
             
             # PHASE 3: SYNTHESIS
             yield AgentStreamEvent(
@@ -387,21 +399,21 @@ class AgentOrchestrator:
             )
             
         except asyncio.TimeoutError:
-            logger.error("Streaming query timed out", exc_info=True)
+            logger.error("Streaming query timed out")
             yield AgentStreamEvent(
                 event_type="error",
                 data={"error": "Query timed out"},
                 message="❌ Query timed out",
             )
         except (ConnectionError, OSError) as e:
-            logger.error(f"Streaming query connection error: {e}", exc_info=True)
+            logger.error(f"Streaming query connection error: {e}")
             yield AgentStreamEvent(
                 event_type="error",
                 data={"error": str(e)},
                 message=f"❌ Connection error: {str(e)}",
             )
         except ValueError as e:
-            logger.error(f"Streaming query validation error: {e}", exc_info=True)
+            logger.error(f"Streaming query validation error: {e}")
             yield AgentStreamEvent(
                 event_type="error",
                 data={"error": str(e)},
@@ -713,12 +725,28 @@ class AgentOrchestrator:
         Returns:
             List of DataSourceRelevance sorted by confidence
         """
+        cache_key = hashlib.md5(query.encode()).hexdigest()
+        now = time.time()
+
+        cached = SUGGESTION_CACHE.get(cache_key)
+        if cached and now - cached["timestamp"] < SUGGESTION_CACHE_TTL:
+            return cached["suggestions"][:max_suggestions]
+
         available_sources = [ds["id"] for ds in mcp_service.get_available_datasources()]
         
         suggestions = await source_detector.detect_sources(
             query=query,
             available_sources=available_sources,
         )
+
+        # Prune cache if too large
+        if len(SUGGESTION_CACHE) >= SUGGESTION_CACHE_MAX_SIZE:
+            sorted_keys = sorted(SUGGESTION_CACHE, key=lambda k: SUGGESTION_CACHE[k]["timestamp"])
+            for key in sorted_keys[:SUGGESTION_CACHE_MAX_SIZE // 10]:
+                del SUGGESTION_CACHE[key]
+
+        # Cache the full ranking so any max_suggestions can be served from it
+        SUGGESTION_CACHE[cache_key] = {"suggestions": suggestions, "timestamp": now}
         
         return suggestions[:max_suggestions]
 
@@ -1,12 +1,13 @@
 """Authentication service for Google OAuth and JWT management."""
 
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 
 from authlib.integrations.starlette_client import OAuth
-from jose import JWTError, jwt
-from sqlalchemy import select
+from jose import JWTError, jwk, jwt
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
@@ -29,6 +30,26 @@ oauth.register(
 )
 
 
+# JWT signing parameters are fixed for the life of the process. The key is
+# constructed once so jose doesn't re-parse the secret on every encode/decode.
+_JWT_ALGORITHM = settings.jwt_algorithm
+_JWT_KEY = jwk.construct(settings.jwt_secret_key, _JWT_ALGORITHM)
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+_JWT_TTL = timedelta(minutes=settings.jwt_access_token_expire_minutes)
+
+
+# User lookups are built once; each call only binds its parameter
+_SELECT_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_SELECT_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_SELECT_USER_BY_GOOGLE_ID = select(User).where(User.google_id == bindparam("google_id"))
+
+
+# Authenticated user cache - spares get_current_user a SELECT on every request
+USER_CACHE: Dict[str, Dict[str, Any]] = {}  # {user_id: {"user": User, "timestamp": float}}
+USER_CACHE_TTL = 60  # 1 minute - profile edits come from OAuth logins, which invalidate
+USER_CACHE_MAX_SIZE = 10_000
+
+
 class AuthService:
     """Service for handling authentication operations."""
 
@@ -45,21 +66,11 @@ class AuthService:
             Encoded JWT token
         """
         to_encode = data.copy()
+        now = datetime.now(timezone.utc)
 
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(
-                minutes=settings.jwt_access_token_expire_minutes
-            )
+        to_encode.update({"exp": now + (expires_delta or _JWT_TTL), "iat": now})
 
-        to_encode.update({"exp": expire, "iat": datetime.utcnow()})
-
-        encoded_jwt = jwt.encode(
-            to_encode,
-            settings.jwt_secret_key,
-            algorithm=settings.jwt_algorithm,
-        )
+        encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
 
         return encoded_jwt
 
@@ -75,11 +86,7 @@ class AuthService:
             Decoded token payload or None if invalid
         """
         try:
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret_key,
-                algorithms=[settings.jwt_algorithm],
-            )
+            payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
             return payload
         except JWTError as e:
             logger.error(f"JWT decode error: {e}")
@@ -107,9 +114,7 @@ class AuthService:
             User object
         """
         # Try to find user by google_id first
-        result = await db.execute(
-            select(User).where(User.google_id == google_id)
-        )
+        result = await db.execute(_SELECT_USER_BY_GOOGLE_ID, {"google_id": google_id})
         user = result.scalar_one_or_none()
 
         if user:
@@ -127,23 +132,27 @@ class AuthService:
 
             if updated:
                 user.updated_at = datetime.utcnow()
+                # Sessions don't expire on commit, so the values just written stay loaded
                 await db.commit()
-                await db.refresh(user)
+                USER_CACHE.pop(user.id, None)
 
             logger.info(f"Existing user logged in: {email}")
             return user
 
-        # Create new user
+        # Create new user. Timestamps are set here rather than by the server
+        # default so every column is known after commit and no re-SELECT is needed.
+        now = datetime.utcnow()
         user = User(
             email=email,
             google_id=google_id,
             name=name,
             profile_picture=profile_picture,
+            created_at=now,
+            updated_at=now,
         )
 
         db.add(user)
         await db.commit()
-        await db.refresh(user)
 
         logger.info(f"New user created: {email}")
         return user
@@ -160,11 +169,47 @@ class AuthService:
         Returns:
             User object or None if not found
         """
-        result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
+        result = await db.execute(_SELECT_USER_BY_ID, {"user_id": user_id})
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_cached_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+        """
+        Get user by ID, served from a short-lived in-process cache.
+
+        Cached users are detached from their session, so they are safe to share
+        across requests for reading attributes but must not be modified.
+
+        Args:
+            db: Database session
+            user_id: User ID
+
+        Returns:
+            User object or None if not found
+        """
+        now = time.time()
+
+        cached = USER_CACHE.get(user_id)
+        if cached and now - cached["timestamp"] < USER_CACHE_TTL:
+            return cached["user"]
+
+        user = await AuthService.get_user_by_id(db, user_id)
+        if not user:
+            USER_CACHE.pop(user_id, None)
+            return None
+
+        # Detach so a rollback in this request's session can't expire the shared copy
+        db.expunge(user)
+
+        # Prune cache if too large
+        if len(USER_CACHE) >= USER_CACHE_MAX_SIZE:
+            sorted_keys = sorted(USER_CACHE, key=lambda k: USER_CACHE[k]["timestamp"])
+            for key in sorted_keys[:USER_CACHE_MAX_SIZE // 10]:
+                del USER_CACHE[key]
+
+        USER_CACHE[user_id] = {"user": user, "timestamp": now}
+        return user
+
     @staticmethod
     async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """
@@ -177,9 +222,7 @@ class AuthService:
         Returns:
             User object or None if not found
         """
-        result = await db.execute(
-            select(User).where(User.email == email)
-        )
+        result = await db.execute(_SELECT_USER_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
     @staticmethod
@@ -194,9 +237,7 @@ class AuthService:
         Returns:
             User object or None if not found
         """
-        result = await db.execute(
-            select(User).where(User.google_id == google_id)
-        )
+        result = await db.execute(_SELECT_USER_BY_GOOGLE_ID, {"google_id": google_id})
         return result.scalar_one_or_none()
 
 
@@ -6,10 +6,14 @@ import time
 from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple
 import json
 import random
+import re
+from collections import OrderedDict
+from itertools import islice
 from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_plus
 from anthropic import Anthropic
 from anthropic.types import ToolUseBlock, TextBlock, MessageStreamEvent
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
@@ -21,6 +25,22 @@ logger = logging.getLogger(__name__)
 # Thread pool for running synchronous Anthropic streaming in background
 _stream_executor = ThreadPoolExecutor(max_workers=10)
 
+# S3 tools that need a bucket argument (auto-injected from the conversation if missing)
+S3_BUCKET_TOOLS = frozenset(("list_objects", "read_object", "search_objects"))
+
+# Upper bound on in-memory anonymous sessions; least recently used are evicted first
+MAX_ANONYMOUS_SESSIONS = 10_000
+# Anonymous sessions idle for longer than this are dropped
+ANONYMOUS_SESSION_IDLE_TTL = 1800  # 30 minutes
+# How often the background sweeper clears out idle sessions
+SESSION_SWEEP_INTERVAL = 900  # 15 minutes
+
+# Recent chat history reads, so repeated polls of one session skip the SELECT;
+# entries are dropped whenever that session's history is written
+CHAT_HISTORY_CACHE: Dict[Tuple[str, str, Optional[str]], Dict[str, Any]] = {}  # {(user_id, datasource, session_id): {"messages": [...], "timestamp": float}}
+CHAT_HISTORY_CACHE_TTL = 2  # seconds
+CHAT_HISTORY_CACHE_MAX_SIZE = 2048
+
 # Performance tracking
 PERF_METRICS = {
     "haiku_routing_time": [],
@@ -102,12 +122,99 @@ def get_quirky_thinking_message(tool_name: str) -> str:
     return random.choice(default_messages)
 
 
+class SessionStore(OrderedDict):
+    """
+    LRU-bounded in-memory session storage with idle expiry.
+
+    Reading or writing a session marks it most recently used; once maxsize
+    is exceeded the least recently used session is dropped. Sessions not
+    touched for idle_ttl seconds are treated as gone and removed on access
+    or by evict_expired().
+
+    Iterating the store follows LRU order, which every read changes; use
+    page() to list sessions in a stable order.
+    """
+
+    def __init__(self, maxsize: int, idle_ttl: float):
+        super().__init__()
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        # Keyed in creation order: refreshing an existing key doesn't move it
+        self._last_access: Dict[str, float] = {}
+
+    def _expire_if_idle(self, key) -> None:
+        last_access = self._last_access.get(key)
+        if last_access is not None and time.monotonic() - last_access >= self.idle_ttl:
+            del self[key]
+
+    def __contains__(self, key):
+        self._expire_if_idle(key)
+        return super().__contains__(key)
+
+    def __getitem__(self, key):
+        self._expire_if_idle(key)
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        self._last_access[key] = time.monotonic()
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        self._last_access[key] = time.monotonic()
+        if len(self) > self.maxsize:
+            oldest, _ = self.popitem(last=False)
+            self._last_access.pop(oldest, None)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._last_access.pop(key, None)
+
+    def page(self, cursor: Optional[str], limit: int) -> List[str]:
+        """
+        Return up to limit session IDs in creation order, after cursor if given.
+
+        Raises:
+            KeyError: If cursor is not a live session (unknown, evicted or expired)
+        """
+        session_ids = iter(self._last_access)
+        if cursor is not None:
+            if cursor not in self:
+                raise KeyError(cursor)
+            for session_id in session_ids:
+                if session_id == cursor:
+                    break
+        return list(islice(session_ids, limit))
+
+    def evict_expired(self) -> int:
+        """Drop all idle sessions and return how many were removed."""
+        # Entries are kept in access order, so idle ones are all at the front
+        cutoff = time.monotonic() - self.idle_ttl
+        evicted = 0
+        while self and self._last_access.get(next(iter(self)), cutoff) <= cutoff:
+            oldest, _ = self.popitem(last=False)
+            self._last_access.pop(oldest, None)
+            evicted += 1
+        return evicted
+
+
 class ChatService:
     """Service for handling chat interactions with Claude and MCP."""
 
     def __init__(self):
         self.client = Anthropic(api_key=settings.anthropic_api_key)
-        self.sessions: Dict[str, List[dict]] = {}  # In-memory session storage for anonymous users
+        # In-memory session storage for anonymous users
+        self.sessions: SessionStore = SessionStore(
+            maxsize=MAX_ANONYMOUS_SESSIONS, idle_ttl=ANONYMOUS_SESSION_IDLE_TTL
+        )
+
+    async def sweep_idle_sessions(self) -> None:
+        """Periodically drop idle anonymous sessions; runs until cancelled."""
+        while True:
+            await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+            evicted = self.sessions.evict_expired()
+            if evicted:
+                logger.info(f"Evicted {evicted} idle anonymous sessions")
 
     async def save_chat_history(
         self,
@@ -140,6 +247,8 @@ class ChatService:
                 db.add(chat_record)
 
             await db.commit()
+            CHAT_HISTORY_CACHE.pop((user_id, datasource, session_id), None)
+            CHAT_HISTORY_CACHE.pop((user_id, datasource, None), None)
             logger.info(f"Saved {len(messages)} messages to chat history for user {user_id[:8]}...")
 
         except Exception as e:
@@ -153,6 +262,7 @@ class ChatService:
         datasource: str,
         session_id: Optional[str] = None,
         db: Optional[AsyncSession] = None,
+        limit: Optional[int] = None,
     ) -> List[dict]:
         """
         Get chat history from MySQL database for authenticated users.
@@ -162,13 +272,25 @@ class ChatService:
             datasource: Datasource name
             session_id: Optional session ID to filter by
             db: Database session
+            limit: Optional number of most recent messages to return
 
         Returns:
-            List of message dicts with 'role' and 'content'
+            List of message dicts with 'role' and 'content', oldest first
         """
         if not db:
             return []
 
+        # Callers append to the returned list, so hand out copies of cached entries
+        cache_key = (user_id, datasource, session_id)
+        now = time.time()
+
+        cached = CHAT_HISTORY_CACHE.get(cache_key)
+        if cached and now - cached["timestamp"] < CHAT_HISTORY_CACHE_TTL:
+            return list(cached["messages"][-limit:] if limit else cached["messages"])
+
+        if limit:
+            return await self._get_recent_chat_history(user_id, datasource, session_id, db, limit)
+
         try:
             # Build query
             query = select(ChatHistory).where(
@@ -179,8 +301,8 @@ class ChatService:
             if session_id:
                 query = query.where(ChatHistory.session_id == session_id)
 
-            # Order by creation time
-            query = query.order_by(ChatHistory.created_at.asc())
+            # Order by creation time; messages saved together share a timestamp, so id breaks ties
+            query = query.order_by(ChatHistory.created_at.asc(), ChatHistory.id.asc())
 
             # Execute query
             result = await db.execute(query)
@@ -190,12 +312,90 @@ class ChatService:
             messages = [record.to_dict() for record in chat_records]
 
             logger.info(f"Retrieved {len(messages)} messages from chat history for user {user_id[:8]}...")
-            return messages
+
+            # Prune cache if too large
+            if len(CHAT_HISTORY_CACHE) >= CHAT_HISTORY_CACHE_MAX_SIZE:
+                sorted_keys = sorted(CHAT_HISTORY_CACHE, key=lambda k: CHAT_HISTORY_CACHE[k]["timestamp"])
+                for key in sorted_keys[:CHAT_HISTORY_CACHE_MAX_SIZE // 10]:
+                    del CHAT_HISTORY_CACHE[key]
+
+            CHAT_HISTORY_CACHE[cache_key] = {"messages": messages, "timestamp": now}
+            return list(messages)
 
         except Exception as e:
             logger.error(f"Failed to get chat history: {str(e)}")
             return []
 
+    async def _get_recent_chat_history(
+        self,
+        user_id: str,
+        datasource: str,
+        session_id: Optional[str],
+        db: AsyncSession,
+        limit: int,
+    ) -> List[dict]:
+        """Get the last `limit` messages of a chat history, oldest first (not cached)."""
+        try:
+            query = select(ChatHistory).where(
+                ChatHistory.user_id == user_id,
+                ChatHistory.datasource == datasource,
+            )
+
+            if session_id:
+                query = query.where(ChatHistory.session_id == session_id)
+
+            # Newest first so the LIMIT keeps the tail, then restore chronological order
+            query = query.order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc()).limit(limit)
+
+            result = await db.execute(query)
+            return [record.to_dict() for record in reversed(result.scalars().all())]
+
+        except Exception as e:
+            logger.error(f"Failed to get chat history: {str(e)}")
+            return []
+
+    async def count_chat_history(
+        self,
+        user_id: str,
+        datasource: str,
+        session_id: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
+    ) -> int:
+        """
+        Count chat history messages without loading them.
+
+        Args:
+            user_id: User ID
+            datasource: Datasource name
+            session_id: Optional session ID to filter by
+            db: Database session
+
+        Returns:
+            Number of stored messages
+        """
+        if not db:
+            return 0
+
+        cached = CHAT_HISTORY_CACHE.get((user_id, datasource, session_id))
+        if cached and time.time() - cached["timestamp"] < CHAT_HISTORY_CACHE_TTL:
+            return len(cached["messages"])
+
+        try:
+            query = select(func.count()).select_from(ChatHistory).where(
+                ChatHistory.user_id == user_id,
+                ChatHistory.datasource == datasource,
+            )
+
+            if session_id:
+                query = query.where(ChatHistory.session_id == session_id)
+
+            result = await db.execute(query)
+            return result.scalar_one()
+
+        except Exception as e:
+            logger.error(f"Failed to count chat history: {str(e)}")
+            return 0
+
     async def _get_session_messages(
         self,
         session_id: str,
@@ -226,7 +426,6 @@ class ChatService:
 
     def _extract_bucket_name_from_messages(self, messages: List[dict]) -> str:
         """Extract S3 bucket name from user messages."""
-        import re
 
         # Look through user messages for bucket names
         for message in reversed(messages):  # Start from most recent
@@ -252,9 +451,6 @@ class ChatService:
 
     def _extract_s3_key_from_messages(self, messages: List[dict]) -> str:
         """Extract S3 object key by finding it in previous list_objects results."""
-        import re
-        import json
-        from urllib.parse import unquote_plus
 
         # First, get all available keys from previous list_objects/search_objects results
         available_keys = []
@@ -371,7 +567,6 @@ class ChatService:
 
     def _extract_table_name_from_messages(self, messages: List[dict]) -> str:
         """Extract MySQL table name from user messages."""
-        import re
 
         # List of common words to exclude
         exclude_words = {
@@ -417,7 +612,6 @@ class ChatService:
 
     def _extract_database_name_from_messages(self, messages: List[dict]) -> str:
         """Extract MySQL database name from user messages or use default."""
-        import re
 
         # List of common words to exclude
         exclude_words = {
@@ -455,7 +649,6 @@ class ChatService:
 
     def _construct_mysql_query_from_messages(self, messages: List[dict]) -> str:
         """Construct a SELECT query from natural language in user messages."""
-        import re
 
         # Look through user messages for query intentions
         for message in reversed(messages):  # Start from most recent
@@ -616,7 +809,6 @@ class ChatService:
                         logger.info(f"⚡⚡⚡ ULTRA-FAST PATH success in {elapsed:.2f}s (no Claude!)")
 
                         # Stream the formatted response in word-sized chunks for smooth effect
-                        import re
                         # Split by words while keeping punctuation and whitespace attached
                         words = re.findall(r'\S+\s*|\n+', formatted)
                         for word in words:
@@ -874,7 +1066,6 @@ S3-SPECIFIC GUIDELINES:
 
         # Add Google Workspace-specific guidance
         if datasource == "google_workspace":
-            from app.core.config import settings
             email_info = f" (configured as: {settings.user_google_email})" if settings.user_google_email else ""
             base_prompt += f"""
 
@@ -990,7 +1181,6 @@ Example: [{{"tool": "list_buckets", "args": {{}}}}]
             response_text = response.content[0].text if response.content else "[]"
 
             # Try to extract JSON from response
-            import re
             json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
             if json_match:
                 tool_calls = json.loads(json_match.group())
@@ -1097,7 +1287,6 @@ Example: [{{"tool": "list_buckets", "args": {{}}}}]
         """
         Format tool results directly without Claude (ultra-fast path).
         """
-        import json
 
         try:
             data = json.loads(result)
@@ -1223,7 +1412,7 @@ Example: [{{"tool": "list_buckets", "args": {{}}}}]
             tool_results = []
             for tool_use in tool_use_blocks:
                 # Auto-fix missing bucket parameter for S3 tools
-                if datasource == "s3" and tool_use.name in ["list_objects", "read_object", "search_objects"]:
+                if datasource == "s3" and tool_use.name in S3_BUCKET_TOOLS:
                     logger.info(f"S3 tool detected: {tool_use.name}, checking bucket parameter...")
                     if "bucket" not in tool_use.input or not tool_use.input.get("bucket"):
                         logger.info(f"Bucket parameter missing in {tool_use.name}, attempting auto-injection...")
@@ -1303,7 +1492,6 @@ Example: [{{"tool": "list_buckets", "args": {{}}}}]
 
                 # Auto-inject user_google_email for Google Workspace tools
                 if datasource == "google_workspace":
-                    from app.core.config import settings
                     current_email = tool_use.input.get("user_google_email", "")
                     # Replace if missing, invalid, or placeholder
                     is_invalid = not current_email or "@" not in current_email or "placeholder" in current_email.lower()
@@ -1478,7 +1666,7 @@ Example: [{{"tool": "list_buckets", "args": {{}}}}]
             tool_results = []
             for i, tool_use in enumerate(tool_use_blocks):
                 # Auto-fix missing bucket parameter for S3 tools
-                if datasource == "s3" and tool_use.name in ["list_objects", "read_object", "search_objects"]:
+                if datasource == "s3" and tool_use.name in S3_BUCKET_TOOLS:
                     logger.info(f"S3 tool detected: {tool_use.name}, checking bucket parameter...")
                     logger.info(f"Current tool_use.input: {tool_use.input}")
                     if "bucket" not in tool_use.input or not tool_use.input.get("bucket"):
@@ -3,7 +3,7 @@
 import logging
 import random
 from typing import List, Dict, Any, Optional, AsyncGenerator
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from anthropic.types import ToolUseBlock, TextBlock
 
 from app.core.config import settings
@@ -81,6 +81,8 @@ class ClaudeClient:
         """Initialize the Claude client."""
         self.api_key = api_key or settings.anthropic_api_key
         self.client = Anthropic(api_key=self.api_key)
+        # Shared async client for calls made directly on the event loop
+        self.async_client = AsyncAnthropic(api_key=self.api_key)
         self.model = DEFAULT_MODEL
 
     def create_message(
@@ -10,6 +10,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
+from app.models.database import UserCredential
 
 logger = logging.getLogger(__name__)
 
@@ -65,8 +66,6 @@ class CredentialService:
         if user_id and db:
             # Authenticated user - use database
             try:
-                from app.models.database import UserCredential
-
                 # Encrypt credentials
                 encrypted_credentials = self._encrypt_credentials(credentials)
 
@@ -130,8 +129,6 @@ class CredentialService:
         if user_id and db:
             # Authenticated user - get from database
             try:
-                from app.models.database import UserCredential
-
                 stmt = select(UserCredential).where(
                     UserCredential.user_id == user_id,
                     UserCredential.datasource == datasource
@@ -184,8 +181,6 @@ class CredentialService:
         if user_id and db:
             # Check database
             try:
-                from app.models.database import UserCredential
-
                 stmt = select(UserCredential).where(
                     UserCredential.user_id == user_id,
                     UserCredential.datasource == datasource
@@ -222,8 +217,6 @@ class CredentialService:
         if user_id and db:
             # Delete from database
             try:
-                from app.models.database import UserCredential
-
                 stmt = select(UserCredential).where(
                     UserCredential.user_id == user_id,
                     UserCredential.datasource == datasource
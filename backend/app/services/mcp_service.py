@@ -126,19 +126,27 @@ class MCPService:
         self._active_clients: Dict[str, tuple] = {}
         self._connection_locks: Dict[str, asyncio.Lock] = {}  # Per-datasource locks
         self._persistent_sessions: Dict[str, Dict[str, Any]] = {}  # Persistent connections
+        self._available_datasources: Optional[List[dict]] = None  # Built once from the registry
 
     def get_available_datasources(self) -> List[dict]:
-        """Get list of available data sources."""
-        return [
-            {
-                "id": key,
-                "name": connector["name"],
-                "description": connector["description"],
-                "icon": key,
-                "enabled": True,
-            }
-            for key, connector in self.connectors.items()
-        ]
+        """
+        Get list of available data sources.
+
+        The connector registry is fixed at startup, so the list is built on
+        first use and shared by every caller afterwards - do not mutate it.
+        """
+        if self._available_datasources is None:
+            self._available_datasources = [
+                {
+                    "id": key,
+                    "name": connector["name"],
+                    "description": connector["description"],
+                    "icon": key,
+                    "enabled": True,
+                }
+                for key, connector in self.connectors.items()
+            ]
+        return self._available_datasources
 
     async def get_cached_tools(self, datasource: str) -> List[dict]:
         """
@@ -0,0 +1,60 @@
+"""Tests for the streaming chat endpoint's SSE output.
+
+These run against the chat router alone, with the chat service stubbed out,
+so no database or Claude API access is needed.
+"""
+
+import json
+import os
+
+# Settings are read at import time; keep them from generating a .env file
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("ENCRYPTION_KEY", "MzNzRk5TbUZ0aGxYZ2RqY0VfYjBnTldaY0ZtRzBhZk0=")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import chat
+from app.core.database import get_db
+from app.middleware.auth import get_current_user_optional
+
+
+def _sse_events(body: str) -> list:
+    """Parse the JSON payloads out of an SSE response body."""
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def test_buffered_text_is_sent_before_stream_error(monkeypatch):
+    """Text still held by the content batcher must arrive before the error frame."""
+
+    async def failing_stream(**kwargs):
+        yield "partial answer"
+        raise RuntimeError("upstream failed")
+
+    monkeypatch.setattr(chat.chat_service, "process_message_stream", failing_stream)
+
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_current_user_optional] = lambda: None
+    app.dependency_overrides[get_db] = lambda: None
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/chat/message/stream",
+            json={"message": "hello", "datasource": "s3", "session_id": "test-session"},
+        )
+
+    assert response.status_code == 200
+    events = _sse_events(response.text)
+    types = [event.get("type") for event in events]
+
+    assert "error" in types
+    content = [event for event in events if event.get("type") == "content"]
+    assert "".join(event["content"] for event in content) == "partial answer"
+    assert types.index("content") < types.index("error")
+    assert events[types.index("error")]["error"] == "upstream failed"
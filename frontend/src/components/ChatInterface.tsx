@@ -114,6 +114,7 @@ export default function ChatInterface({ datasource }: ChatInterfaceProps) {
     const startTime = performance.now()
     let accumulatedMessage = ''
     let hasRealContent = false
+    let answerTimestamp = ''
 
     // Add initial thinking step
     const thinkingStepId = addAgentStep({
@@ -228,12 +229,13 @@ export default function ChatInterface({ datasource }: ChatInterfaceProps) {
             }]
           })
 
+          answerTimestamp = new Date().toISOString()
           setMessages((prev) => [
             ...prev,
             {
               role: 'assistant',
               content: accumulatedMessage,
-              timestamp: new Date().toISOString(),
+              timestamp: answerTimestamp,
               responseTime,
               sources,
               followUpQuestions: followUps,
@@ -282,6 +284,16 @@ export default function ChatInterface({ datasource }: ChatInterfaceProps) {
             // Add new step
             return [...prev, step]
           })
+        },
+        // onSource
+        undefined,
+        // onFollowUps (arrive after onDone)
+        (questions) => {
+          setMessages((prev) => prev.map((m) =>
+            m.role === 'assistant' && m.timestamp === answerTimestamp
+              ? { ...m, followUpQuestions: questions }
+              : m
+          ))
         }
       )
     } catch (error) {
@@ -77,7 +77,7 @@ export interface AgentStreamEvent {
   event_type: string;    // Event type
   data: any;             // Event-specific data
   message?: string;      // Human-readable message
-  timestamp: string;     // Event timestamp
+  timestamp?: string;    // Event timestamp (omitted on synthesis_chunk and error events)
 }
 
 /**
@@ -56,7 +56,8 @@ export const chatApi = {
     onDone: (metadata?: { sources?: SourceReference[]; followUpQuestions?: string[] }) => void,
     onError: (error: string) => void,
     onAgentStep?: (step: AgentStep) => void,
-    onSource?: (source: SourceReference) => void
+    onSource?: (source: SourceReference) => void,
+    onFollowUps?: (questions: string[]) => void
   ): Promise<void> => {
     const response = await fetch(`${API_BASE_URL}/api/chat/message/stream`, {
       method: 'POST',
@@ -115,6 +116,12 @@ export const chatApi = {
                     followUpQuestions: data.follow_up_questions,
                   });
                   break;
+                case 'follow_ups':
+                  // Sent after 'done' so the answer is not held back by their generation
+                  if (onFollowUps) {
+                    onFollowUps(data.follow_up_questions);
+                  }
+                  break;
                 case 'error':
                   onError(data.error);
                   break;